@@ -21,7 +21,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.crawler.crawler import Crawler
+from src.crawler.crawler import Crawler, create_session
 from src.embedder.embedder import Embedder
 from src.search.semantic import SemanticSearch
 
@@ -81,6 +81,21 @@ class JobStatus(BaseModel):
 # In-memory job storage (replace with Redis/database in production)
 jobs: Dict[str, JobStatus] = {}
 
+# HTTP session shared by all crawl jobs so Firecrawl connections stay alive between jobs
+crawl_session = None
+
+@app.on_event("startup")
+async def open_crawl_session():
+    """Create the shared crawl session."""
+    global crawl_session
+    crawl_session = create_session()
+
+@app.on_event("shutdown")
+async def close_crawl_session():
+    """Close the shared crawl session."""
+    if crawl_session is not None:
+        await crawl_session.close()
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -212,7 +227,7 @@ async def run_crawl_job(job_id: str, url: str, max_depth: int, max_pages: int):
         # Run crawler
         logger.info(f"Starting crawl for job {job_id}: {url}")
         crawler = Crawler()
-        await crawler.crawl(url)
+        await crawler.crawl(url, session=crawl_session)
         
         # Update job status
         jobs[job_id].message = "Crawl completed, starting embedding..."
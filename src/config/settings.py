@@ -9,12 +9,62 @@ REST_API_CONFIG = {
     "base_url": os.getenv("REST_CONFIG_BASE_URL", "http://localhost:4000") + "/api",
     "timeout": int(os.getenv("REST_CONFIG_TIMEOUT", "30")),
     "retry_attempts": 3,
+    "batch_size": int(os.getenv("REST_CONFIG_BATCH_SIZE", "50")),  # Pages per pages/batch request
+    # Gzip POST bodies (the API server must accept Content-Encoding: gzip)
+    "gzip_requests": os.getenv("REST_CONFIG_GZIP_REQUESTS", "false").lower() == "true",
+    # Send each encoded group of pages in one vectors/embed/batch request
+    # instead of one vectors/embed request per page (the API server must
+    # provide the batch endpoint)
+    "vectors_batch": os.getenv("REST_CONFIG_VECTORS_BATCH", "false").lower() == "true",
+    # How the embedder and search send vectors: "json" (lists of floats), or
+    # "float32" / "float16" (base64 of the raw little-endian floats in
+    # page_vector_b64 / vector_b64 fields, ~2x / ~4x smaller; the API server
+    # must decode them)
+    "vector_encoding": os.getenv("REST_CONFIG_VECTOR_ENCODING", "json"),
 }
 
 # Model configuration
 MODEL_CONFIG = {
     "name": "BAAI/bge-large-en-v1.5",
     "chunk_tokens": 500,
+    # Page-level embeddings see at most this many chunker tokens of the page;
+    # kept well above the model's 512-token window so the model's own
+    # truncation still decides what it reads
+    "page_text_tokens": 1024,
+    "encode_batch_size": 64,  # Texts per model forward pass
+    "pages_per_encode": 32,  # Pages whose texts and chunks share one model.encode call
+    # Derive each page's vector as the normalized mean of its chunk vectors
+    # instead of encoding the page text separately (one forward pass fewer
+    # per page; changes the page vectors, so A/B it before switching)
+    "fuse_page_vec": os.getenv("EMBED_FUSE_PAGE_VEC", "false").lower() == "true",
+    # "torch", "onnx" (ONNX Runtime on CPU) or "openvino" (see src/embedder/model.py)
+    "backend": os.getenv("EMBED_BACKEND", "torch"),
+    # ONNX file inside the model repo; use an int8-quantized export for speed
+    "onnx_file": os.getenv("EMBED_ONNX_FILE", "onnx/model.onnx"),
+    # Weights dtype for the torch backend: "auto" (fp16 on CUDA, fp32 on CPU),
+    # "fp32", "fp16" or "bf16" (worth it on CPUs with AVX512-BF16/AMX).
+    # Vectors are cast back to float32 after encoding either way
+    "dtype": os.getenv("EMBED_DTYPE", "auto"),
+    # CPU threads for model inference; 0 keeps the runtime default (one per
+    # physical core). Set it in containers whose CPU quota is below the
+    # host's core count, or divide it between several embedder processes
+    "threads": int(os.getenv("EMBED_THREADS", "0")),
+    # torch.compile the transformer (torch backend, PyTorch >= 2.1); the
+    # first batches of each new shape are slow while it compiles. Ignored
+    # with encode_devices: compiled modules can't be sent to the workers
+    "compile": os.getenv("EMBED_COMPILE", "false").lower() == "true",
+    # Devices to encode on in parallel, one worker process each (e.g.
+    # EMBED_DEVICES=cuda:0,cuda:1); empty encodes in-process on the default
+    # device. Raise pages_per_encode with several devices so each gets work
+    "encode_devices": [d.strip() for d in os.getenv("EMBED_DEVICES", "").split(",") if d.strip()],
+    # Vectors remembered per text (by hash) so repeated chunks, e.g. shared
+    # boilerplate or duplicate pages, are encoded once; ~4 KB each, 0 disables
+    "vector_cache_size": 10_000,
+    # Decimals kept when vectors are sent as JSON. Unit-vector components
+    # are below 1, so rounding changes each by at most 5e-8, about float32's
+    # resolution near 1.0 (pgvector stores float32), at about half the
+    # payload of full float64 reprs
+    "vector_decimals": 7,
 }
 
 # Crawler configuration
@@ -22,6 +72,19 @@ CRAWLER_CONFIG = {
     "max_depth": 3,
     "max_pages": 1_000,
     "crawl_delay": 0.2,
+    "concurrency": 8,  # Max simultaneous page fetches
+    "per_host": 8,  # Max open connections to one host (the Firecrawl API)
+    # Link extractor for pages Firecrawl reports no links for: "selectolax"
+    # (fastest parser), "lxml" (shares the parser's tree), or "regex" (no parser)
+    "link_extractor": os.getenv("CRAWLER_LINK_EXTRACTOR", "selectolax"),
+    # Worker processes for page parsing and HTML link extraction; 0 uses threads
+    # in the crawler process (enough unless parsing saturates one core)
+    "parse_processes": int(os.getenv("CRAWLER_PARSE_PROCESSES", "0")),
+    # Track seen URLs in a Bloom filter once max_pages reaches this size
+    "bloom_min_pages": 100_000,
+    # Link lists remembered per (page path, HTML hash), so copies of a page
+    # under other query strings skip link extraction; 0 disables the cache
+    "link_cache_size": 2048,
 }
 
 # Search configuration
@@ -5,11 +5,13 @@ Firecrawl-backed implementation of the Fetcher interface.
 This module provides a high-performance web scraping implementation using Firecrawl:
 • Posts URLs to /v1/scrape endpoint
 • Returns HTML, markdown, and links directly
-• Implements rate limiting and concurrent request management
+• Implements concurrent request management
 • Optimized for speed with reduced delays and increased concurrency
 
+Per-host politeness delays are applied by the crawler (CRAWLER_CONFIG["crawl_delay"]),
+not here.
+
 Performance optimizations:
-- Rate limit: 0.2 seconds between requests (reduced from 1.0)
 - Concurrency: 8 simultaneous requests (increased from 3)
 - Poll delay: 1.0 seconds for status checking
 - Max retries: 3 attempts per URL
@@ -28,6 +30,7 @@ Example:
 
 from __future__ import annotations
 import aiohttp, asyncio
+import json
 import os
 from typing import Any, Dict
 from src.core.interfaces.fetcher import Fetcher, FetchResult
@@ -35,33 +38,43 @@ from src.core.interfaces.fetcher import Fetcher, FetchResult
 # Default Firecrawl URL - can be overridden via environment variable or set_firecrawl_url()
 FIRECRAWL_URL = os.getenv("FIRECRAWL_URL", "http://localhost:3002/v1")
 
+# Firecrawl responses larger than this are skipped instead of being decoded
+MAX_RESPONSE_BYTES = int(os.getenv("FIRECRAWL_MAX_RESPONSE_BYTES", str(20 * 1024 * 1024)))
+
+class ResponseTooLarge(Exception):
+    """Raised when a Firecrawl response exceeds MAX_RESPONSE_BYTES."""
+
 class FirecrawlFetcher(Fetcher):
-    def __init__(self, session: aiohttp.ClientSession, poll_delay: float = 1.0, max_retries: int = 3, rate_limit: float = 0.2):
+    def __init__(self, session: aiohttp.ClientSession, poll_delay: float = 1.0, max_retries: int = 3):
         super().__init__(concurrency=1)          # parent uses this attr
         self._session = session
         self._delay   = poll_delay
         self._firecrawl_url = FIRECRAWL_URL
         self._max_retries = max_retries
-        self._rate_limit = rate_limit  # seconds between requests (reduced from 1.0 to 0.2)
-        self._last_request_time = 0
         self._request_semaphore = asyncio.Semaphore(8)  # Increased from 3 to 8 concurrent requests
 
     def set_firecrawl_url(self, url: str):
         """Set the Firecrawl server URL."""
         self._firecrawl_url = url
 
-    async def _rate_limit_request(self):
-        """Ensure we don't exceed rate limits."""
-        now = asyncio.get_event_loop().time()
-        time_since_last = now - self._last_request_time
-        if time_since_last < self._rate_limit:
-            await asyncio.sleep(self._rate_limit - time_since_last)
-        self._last_request_time = asyncio.get_event_loop().time()
+    @staticmethod
+    async def _read_limited(r: aiohttp.ClientResponse, url: str) -> bytearray:
+        """
+        Read a response body, raising ResponseTooLarge past MAX_RESPONSE_BYTES.
+        
+        Chunked or compressed responses have no usable Content-Length, so
+        the body is read in chunks and counted as it arrives.
+        """
+        body = bytearray()
+        async for chunk in r.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > MAX_RESPONSE_BYTES:
+                raise ResponseTooLarge(f"Firecrawl response too large (over {MAX_RESPONSE_BYTES} bytes) for {url}")
+        return body
 
     async def _scrape_url(self, url: str) -> Dict[str, Any]:
-        """Scrape a single URL using the Firecrawl API with retry logic and rate limiting."""
+        """Scrape a single URL using the Firecrawl API with retry logic."""
         async with self._request_semaphore:  # Limit concurrent requests
-            await self._rate_limit_request()  # Rate limiting
             
             body = {
                 "url": url,
@@ -82,10 +95,16 @@ class FirecrawlFetcher(Fetcher):
             for attempt in range(self._max_retries):
                 try:
                     # Add timeout to prevent hanging requests
-                    timeout = aiohttp.ClientTimeout(total=60, connect=10)
+                    # sock_read stays above Firecrawl's own 30s scrape timeout
+                    timeout = aiohttp.ClientTimeout(total=60, connect=10, sock_read=45)
                     async with self._session.post(f"{self._firecrawl_url}/scrape", json=body, timeout=timeout) as r:
                         if r.status == 200:
-                            response = await r.json()
+                            # Skip oversized bodies before reading them
+                            if r.content_length is not None and r.content_length > MAX_RESPONSE_BYTES:
+                                raise ResponseTooLarge(f"Firecrawl response too large ({r.content_length} bytes) for {url}")
+                            # Firecrawl always returns UTF-8 JSON; json.loads decodes the raw
+                            # bytes itself, skipping the stripped copy and str decode r.json() makes
+                            response = json.loads(await self._read_limited(r, url))
                             if response.get("success"):
                                 return response.get("data", {})
                             else:
@@ -100,6 +119,9 @@ class FirecrawlFetcher(Fetcher):
                                 continue
                             raise Exception(f"Firecrawl API error {r.status}")
                             
+                except ResponseTooLarge:
+                    raise  # Retrying would only re-scrape the same oversized page
+                    
                 except asyncio.TimeoutError:
                     if attempt < self._max_retries - 1:
                         await asyncio.sleep(2 ** attempt)  # Exponential backoff
@@ -29,7 +29,7 @@ import hashlib
 import json
 import re
 import trafilatura
-from bs4 import BeautifulSoup
+from trafilatura.utils import load_html
 from src.core.interfaces.parser import Parser, PageAssets
 from src.core.interfaces.fetcher import FetchResult
 
@@ -39,7 +39,20 @@ class FirecrawlParser(Parser):
     def __init__(self, enable_categorization: bool = False):
         self.enable_categorization = enable_categorization
 
-    def parse(self, url: str, html: str, extra: dict | None = None) -> PageAssets:
+    def load_tree(self, html: str):
+        """
+        Parse HTML into the lxml tree parse() works on, or None if it can't.
+        
+        Callers that also need the tree (e.g. the crawler's link extraction)
+        build it once here and pass it to parse(). trafilatura extracts from
+        a copy, so the tree is unchanged after parse().
+        """
+        try:
+            return load_html(html)
+        except Exception:
+            return None
+
+    def parse(self, url: str, html: str, extra: dict | None = None, tree=None) -> PageAssets:
         if extra is None or "markdown" not in extra:
             raise ValueError("FirecrawlParser expects markdown in FetchResult.extra")
 
@@ -61,13 +74,21 @@ class FirecrawlParser(Parser):
                     title = line[2:].strip()
                     break
         
+        # Parse the HTML once (unless the caller already did, see load_tree)
+        # and share the tree between the metadata and content extraction
+        # below (trafilatura accepts a tree or a string)
+        if tree is None:
+            tree = self.load_tree(html)
+        if tree is None:
+            tree = html
+        
         # If still no title, try to extract from HTML using trafilatura
         if not title:
             try:
                 # Extract title using trafilatura
-                extracted_title = trafilatura.extract_metadata(html, title_only=True)
-                if extracted_title:
-                    title = extracted_title.strip()
+                extracted_metadata = trafilatura.extract_metadata(tree)
+                if extracted_metadata and extracted_metadata.title:
+                    title = extracted_metadata.title.strip()
             except:
                 title = ""
         
@@ -78,7 +99,7 @@ class FirecrawlParser(Parser):
         # Use trafilatura to extract clean text from the HTML (more accurate than markdown processing)
         try:
             # Extract main content using trafilatura (same approach as clean.py)
-            extracted_text = trafilatura.extract(html, 
+            extracted_text = trafilatura.extract(tree, 
                                                include_comments=False,
                                                include_tables=False,
                                                no_fallback=False,
@@ -137,6 +158,7 @@ class FirecrawlParser(Parser):
             clean_text=clean_text,  # Use readability-extracted text for embedding
             seo_head=seo_head,      # Store metadata + markdown as JSON
             title=title,
+            metadata=metadata_dict,  # Same data as seo_head, already parsed
         )
 
     def _markdown_to_clean_text(self, markdown: str) -> str:
@@ -22,10 +22,13 @@ Example:
 """
 import requests
 import json
+import gzip
+import hashlib
+from datetime import datetime
 from typing import List, Tuple, Optional
 from src.core.interfaces.storage import Storage
 from src.core.interfaces.parser import PageAssets
-from src.config.settings import REST_API_CONFIG
+from src.config.settings import REST_API_CONFIG, MODEL_CONFIG
 
 class RestApiStorage(Storage):
     """
@@ -56,25 +59,33 @@ class RestApiStorage(Storage):
                 - base_url: Base URL for the API
                 - timeout: Request timeout in seconds
                 - retry_attempts: Number of retry attempts
+                - gzip_requests: Gzip POST bodies (optional, default False)
+                - batch_size: Pages buffered per pages/batch request (optional, default 50)
         """
         self.base_url = rest_cfg["base_url"]
         self.timeout = rest_cfg["timeout"]
         self.retry_attempts = rest_cfg["retry_attempts"]
+        self.gzip_requests = rest_cfg.get("gzip_requests", False)
         self._batch_buffer = []  # Buffer for batching pages
-        self._batch_size = 10    # Number of pages to batch together
+        self._batch_size = rest_cfg.get("batch_size", 50)  # Number of pages to batch together
         self.session = requests.Session()
         self.session.headers.update({'Content-Type': 'application/json'})
 
     def _make_request(self, method: str, endpoint: str, data: dict = None) -> dict:
         """Make HTTP request to API"""
         url = f"{self.base_url}/{endpoint}"
-        headers = {"Content-Type": "application/json"}
         
         try:
+            # Go through the shared session so the connection (and its
+            # Content-Type header) is set up once and reused for every call
             if method.upper() == "GET":
-                response = requests.get(url, headers=headers, timeout=self.timeout)
+                response = self.session.get(url, timeout=self.timeout)
+            elif method.upper() == "POST" and self.gzip_requests:
+                # Batches carry raw HTML, which compresses well; level 1 keeps CPU cost low
+                body = gzip.compress(json.dumps(data).encode("utf-8"), compresslevel=1)
+                response = self.session.post(url, data=body, headers={"Content-Encoding": "gzip"}, timeout=self.timeout)
             elif method.upper() == "POST":
-                response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+                response = self.session.post(url, json=data, timeout=self.timeout)
             else:
                 raise ValueError(f"Unsupported method: {method}")
             
@@ -90,8 +101,10 @@ class RestApiStorage(Storage):
 
     def _extract_metadata(self, seo_head: str) -> dict:
         """Extract metadata from seo_head JSON string."""
+        if not seo_head:
+            return {}
         try:
-            if seo_head and seo_head.strip():
+            if seo_head.strip():
                 return json.loads(seo_head)
             return {}
         except (json.JSONDecodeError, TypeError):
@@ -140,38 +153,7 @@ class RestApiStorage(Storage):
             >>> content_changed, seo_changed = storage.upsert_page(assets)
         """
         try:
-            # Extract metadata from SEO head
-            metadata = self._extract_metadata(assets.seo_head)
-            
-            # Add page_type to metadata if not present
-            if "page_type" not in metadata:
-                metadata["page_type"] = "other"
-            
-            # Prepare page data for our database API
-            from datetime import datetime
-            import hashlib
-            
-            # Create a proper checksum from the clean text (use SHA256 to match firecrawl_parser)
-            checksum = hashlib.sha256(assets.clean_text.encode()).hexdigest()
-            
-            # Get current timestamp for last_seen (always update this)
-            current_time = datetime.now().isoformat()
-            
-            # Check if we need to update markdown_changed by comparing checksums
-            # We'll let the API handle this logic since we don't have the previous checksum
-            # The API should only update markdown_changed if the checksum changed
-            
-            page_data = {
-                "url": assets.url,
-                "title": assets.title,
-                "clean_text": assets.clean_text,
-                "raw_html": assets.raw_html,
-                "markdown_checksum": checksum,
-                "markdown_changed": current_time,  # API will handle if this should be updated
-                "last_seen": current_time,         # Always update this
-                "metadata": metadata,
-                "page_type": metadata.get("page_type", "other")
-            }
+            page_data = self._page_data(assets)
             
             # Add to batch buffer
             self._batch_buffer.append(page_data)
@@ -191,6 +173,58 @@ class RestApiStorage(Storage):
             print(f"❌ DB Failed to prepare page: {assets.url} - {e}")
             return False, False  # Indicate failure
 
+    def upsert_pages_batch(self, assets_list: List[PageAssets]) -> List[Tuple[bool, bool]]:
+        """
+        Upsert several pages in one call.
+        
+        Each page gets exactly the result upsert_page() would give it: pages
+        go through the same batch buffer, and a failed pages/batch flush is
+        reported on the page that triggered it while the buffered pages stay
+        queued for the next flush. Lets callers hand over a group of pages
+        with one call (e.g. one worker-thread hop) instead of one per page.
+        
+        Args:
+            assets_list: PageAssets objects to store
+            
+        Returns:
+            One (content_changed, seo_changed) tuple per page, in order
+        """
+        return [self.upsert_page(assets) for assets in assets_list]
+
+    def _page_data(self, assets: PageAssets) -> dict:
+        """Build the pages API record for one page."""
+        # Use the parser's metadata dict when available, otherwise parse SEO head
+        if assets.metadata is not None:
+            metadata = dict(assets.metadata)  # Copy: the parser owns assets.metadata
+        else:
+            metadata = self._extract_metadata(assets.seo_head)
+        
+        # Add page_type to metadata if not present
+        if "page_type" not in metadata:
+            metadata["page_type"] = "other"
+        
+        # Create a proper checksum from the clean text (use SHA256 to match firecrawl_parser)
+        checksum = hashlib.sha256(assets.clean_text.encode()).hexdigest()
+        
+        # Get current timestamp for last_seen (always update this)
+        current_time = datetime.now().isoformat()
+        
+        # Check if we need to update markdown_changed by comparing checksums
+        # We'll let the API handle this logic since we don't have the previous checksum
+        # The API should only update markdown_changed if the checksum changed
+        
+        return {
+            "url": assets.url,
+            "title": assets.title,
+            "clean_text": assets.clean_text,
+            "raw_html": assets.raw_html,
+            "markdown_checksum": checksum,
+            "markdown_changed": current_time,  # API will handle if this should be updated
+            "last_seen": current_time,         # Always update this
+            "metadata": metadata,
+            "page_type": metadata.get("page_type", "other")
+        }
+
     def pages_for_embedding(self) -> list[tuple[str, str]]:
         """
         Get pages that need embedding via REST API.
@@ -218,18 +252,20 @@ class RestApiStorage(Storage):
             print(f"[ERROR] Exception in pages_for_embedding: {e}")
             return []
 
-    def save_vectors(self, url: str, vecs: list[list[float]]) -> None:
+    def save_vectors(self, url: str, vecs: list[list[float]], chunk_texts: Optional[List[str]] = None) -> None:
         """
         Save page and chunk vectors via REST API.
         
         This method:
         1. Computes page vector as mean of chunk vectors
-        2. Updates the page's summary vector via REST API
-        3. Stores individual chunk vectors via REST API
+        2. Sends the page vector and chunk vectors in a single
+           ``vectors/embed`` request (the chunk list is built once)
         
         Args:
             url: The URL of the page
             vecs: List of chunk vectors to store
+            chunk_texts: Optional chunk texts aligned with ``vecs``; when
+                omitted the ``text`` field is left out of the payload
             
         Example:
             >>> storage = RestApiStorage(rest_cfg)
@@ -240,39 +276,27 @@ class RestApiStorage(Storage):
         try:
             # Compute page vector as mean of chunk vectors
             import numpy as np
-            page_vec = np.mean(vecs, axis=0).tolist()
+            vec_array = np.asarray(vecs, dtype=np.float32)
+            # Rounded float64 values serialize to short JSON numbers
+            decimals = MODEL_CONFIG["vector_decimals"]
+            page_vec = vec_array.mean(axis=0, dtype=np.float64).round(decimals).tolist()
             
-            # Prepare chunks data for our database API
-            chunks_data = [
-                {
-                    "chunk_index": i,
-                    "text": f"Chunk {i}",  # Placeholder text
-                    "vec": vec.tolist()
-                }
-                for i, vec in enumerate(vecs)
+            # Build the chunk payload once; vectors/embed stores both the
+            # summary vector and the chunks, so no separate chunks/batch call
+            chunks = [
+                {"chunk_index": i, "vector": vec}
+                for i, vec in enumerate(vec_array.astype(np.float64).round(decimals).tolist())
             ]
+            if chunk_texts is not None:
+                for chunk, text in zip(chunks, chunk_texts):
+                    chunk["text"] = text
             
-            # Store chunks using the chunks batch endpoint
-            self._make_request("POST", "chunks/batch", {
-                "page_url": url,
-                "chunks_data": chunks_data
-            })
-            
-            # Update page with summary vector using the vectors embed endpoint
-            embed_data = {
+            self._make_request("POST", "vectors/embed", {
                 "url": url,
                 "page_vector": page_vec,
-                "chunks": [
-                    {
-                        "text": f"Chunk {i}",
-                        "vector": vec.tolist()
-                    }
-                    for i, vec in enumerate(vecs)
-                ]
-            }
-            
-            self._make_request("POST", "vectors/embed", embed_data)
+                "chunks": chunks
+            })
             
         except Exception as e:
             print(f"[ERROR] Exception in save_vectors: {e}")
-            raise 
\ No newline at end of file
+            raise
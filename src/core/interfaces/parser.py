@@ -19,7 +19,7 @@ Example:
             )
     ```
 """
-from typing import Protocol, NamedTuple
+from typing import Protocol, NamedTuple, Optional
 
 class PageAssets(NamedTuple):
     """
@@ -34,6 +34,8 @@ class PageAssets(NamedTuple):
         clean_text: Extracted and cleaned text content
         seo_head: SEO-related elements from the head section
         title: The page title
+        metadata: The seo_head metadata as a dict, when the parser already
+            has it (saves storage from parsing seo_head again)
         
     Example:
         >>> assets = PageAssets(
@@ -51,6 +53,7 @@ class PageAssets(NamedTuple):
     clean_text: str
     seo_head: str
     title: str
+    metadata: Optional[dict] = None
 
 class Parser(Protocol):
     """
@@ -10,8 +10,7 @@ Example
 """
 
 import sys
-import asyncio
-from .crawler import Crawler
+from .crawler import Crawler, run
 
 def main() -> None:
     if len(sys.argv) != 2:
@@ -19,8 +18,11 @@ def main() -> None:
         sys.exit(1)
 
     start_url = Crawler.canonical(sys.argv[1])
-    crawler = Crawler()
-    asyncio.run(crawler.crawl(start_url))
+    run(_crawl(start_url))
+
+async def _crawl(start_url: str) -> None:
+    async with Crawler() as crawler:
+        await crawler.crawl(start_url)
 
 if __name__ == "__main__":  # pragma: no cover
     main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Bloom filter for tracking seen URLs on large crawls.
+
+Items may be strings or 64-bit unsigned ints (e.g. URL fingerprints).
+
+A plain ``set`` keeps every canonical URL string alive for the whole crawl
+(roughly 80+ bytes per URL). For crawls with very high ``max_pages`` this
+filter stores a fixed number of bits per URL instead, at the cost of a small
+false-positive rate (a URL may occasionally be treated as already seen).
+
+Example:
+    ```python
+    seen = BloomFilter(capacity=1_000_000, error_rate=0.001)
+    seen.add("https://example.com/page")
+    "https://example.com/page" in seen   # True
+    len(seen)                             # 1
+    ```
+"""
+import hashlib
+import math
+from typing import Union
+
+
+class BloomFilter:
+    """
+    Fixed-capacity Bloom filter with a set-like ``add``/``in``/``len`` API.
+
+    Attributes:
+        capacity: Expected number of items
+        error_rate: Target false-positive rate at ``capacity`` items
+        num_bits: Size of the bit array
+        num_hashes: Number of bit positions set per item
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: Union[str, int]):
+        """Yield bit positions for an item using double hashing over one digest."""
+        data = item.to_bytes(8, "little") if isinstance(item, int) else item.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: Union[str, int]) -> None:
+        """Add an item; only counts it if it was not (apparently) present."""
+        new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self._count += 1
+
+    def __contains__(self, item: Union[str, int]) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self._count
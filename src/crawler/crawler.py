@@ -2,8 +2,8 @@
 Concurrent BFS crawler using pluggable Fetcher, Parser, Storage.
 
 This crawler implements a breadth-first search (BFS) algorithm to crawl websites,
-processing pages level by level. It uses asynchronous programming for efficient
-concurrent fetching of pages.
+processing pages in breadth-first (FIFO) order. It uses asynchronous programming
+for efficient concurrent fetching of pages.
 
 Example:
     ```python
@@ -20,12 +20,23 @@ Example:
 """
 # Importing necessary libraries
 import asyncio  # Used for asynchronous programming
-from typing import List, Set, Tuple, Optional, Dict  # Type hints for Python
-from urllib.parse import urljoin, urlparse, urldefrag  # Tools for URL handling
-from bs4 import BeautifulSoup  # Library for parsing HTML
+from collections import OrderedDict  # LRU order for the link cache
+from functools import lru_cache  # Memoizes canonical()
+from concurrent.futures import ProcessPoolExecutor  # Parses pages on other cores
+import multiprocessing
+from typing import List, Set, Tuple, Optional, Dict, Iterable, Iterator  # Type hints for Python
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qs, urlencode, uses_params, SplitResult  # Tools for URL handling
+from lxml import etree  # Fast HTML parsing for link extraction
+import hashlib  # For compact URL fingerprints
+import html as html_lib  # For unescaping entities in regex-extracted hrefs
+import re
+import sys
 import logging  # For logging messages and errors
 import aiohttp
 import importlib
+import threading
+
+from src.crawler.bloom import BloomFilter
 
 # Importing configuration from settings file
 from src.config.settings import (
@@ -40,6 +51,231 @@ from src.config.settings import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-page status lines are written to stdout in batches of this size
+_REPORT_BATCH = 50
+
+# A progress line is printed every this many processed pages
+_PROGRESS_EVERY = 100
+
+# Most pages the storage writer hands to the store in one call
+_WRITE_BATCH = 50
+
+# hrefs with these prefixes never point at crawlable pages (checked with one
+# tuple startswith; a compiled regex alternation measured ~2.5x slower)
+_SKIP_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:', 'data:', 'about:', 'ftp:', 'sms:', 'intent:')
+
+# Regex fast path for link extraction: href value of each <a> tag (quoted or bare)
+_HREF_RE = re.compile(r"""<a\b[^>]*?\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+
+# Plain http(s) URL split into scheme, host, path and optional query (the
+# fragment is dropped); URLs that urlsplit would clean up or reject don't match
+_HTTP_URL_RE = re.compile(
+    r"(https?)://([A-Za-z0-9.\-_~:@%!$&'()*+,;=]+)((?:/[^?#\s]*)?)(?:\?([^#\s]*))?(?:#.*)?",
+    re.DOTALL,
+)
+
+def strip_www(netloc: str) -> str:
+    """
+    Lowercase a netloc and remove a leading "www." prefix.
+    
+    Note: str.lstrip('www.') would strip any run of 'w' and '.' characters
+    ("wow.example.com" -> "ow.example.com"), so the prefix is sliced off.
+    """
+    netloc = netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+@lru_cache(maxsize=100_000)
+def split_url(url: str) -> SplitResult:
+    """
+    Memoized urlsplit().
+    
+    The same URL is split several times per crawl (domain checks, host
+    politeness, link filtering), and each split is pure-Python work.
+    SplitResult is an immutable tuple, so sharing cached results is safe.
+    """
+    return urlsplit(url)
+
+@lru_cache(maxsize=100_000)
+def url_host(url: str) -> str:
+    """
+    Memoized host of a URL, lowercased and without "www." (see strip_www).
+    
+    Two URLs are on the same domain exactly when their url_host() values
+    are equal, so repeated domain checks are one dict lookup per URL.
+    """
+    return strip_www(split_url(url).netloc)
+
+class _LinkCache:
+    """
+    LRU cache of a page's same-domain links, keyed by page path and HTML hash.
+    
+    Relative hrefs resolve against the page's scheme, host and path, but
+    never its query (empty hrefs are skipped), so pages that differ only in
+    query string (tracking parameters, session ids) and serve the same HTML
+    have the same links. The key holds a 16-byte digest, not the HTML.
+    
+    Thread-safe: pages are processed on several worker threads.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, bytes], List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, html: str) -> Tuple[str, bytes]:
+        u = split_url(url)
+        digest = hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        return f"{u.scheme}://{u.netloc}{u.path}", digest
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[List[str]]:
+        with self._lock:
+            links = self._entries.get(key)
+            if links is not None:
+                self._entries.move_to_end(key)
+            return links
+
+    def put(self, key: Tuple[str, bytes], links: List[str]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = links
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Shared by every crawl in this process (worker processes get their own)
+_link_cache = _LinkCache(CRAWLER_CONFIG["link_cache_size"])
+
+def clear_url_caches() -> None:
+    """Empty the URL memoization caches (canonical(), split_url(), url_host()) and the link cache."""
+    Crawler.canonical.cache_clear()
+    split_url.cache_clear()
+    url_host.cache_clear()
+    _link_cache.clear()
+
+def url_fingerprint(url: str) -> int:
+    """
+    Return a 64-bit fingerprint of a URL for membership checks.
+    
+    Deduplication only needs to know whether a URL was queued before, so the
+    seen set stores these fixed-size ints instead of full URL strings. Two
+    distinct URLs collide with probability ~n²/2⁶⁵ (about 1 in 37 million
+    for a million URLs); a collision only means one page is skipped.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    Create the aiohttp session used by crawl fetchers.
+    
+    Every request goes to the Firecrawl API, so the connector keeps up to
+    CRAWLER_CONFIG["per_host"] keep-alive connections to that host and
+    caches DNS. Callers running several crawls (e.g. the API server) can
+    create one session and pass it to Crawler.crawl() so connections are
+    reused across crawls rather than re-established per crawl.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max(64, CRAWLER_CONFIG["concurrency"]),
+        limit_per_host=CRAWLER_CONFIG["per_host"],
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        # Keep idle connections through pauses in the crawl (default is 15s)
+        keepalive_timeout=75,
+        enable_cleanup_closed=True,
+    )
+    # Default for requests that don't set their own timeout
+    timeout = aiohttp.ClientTimeout(total=60, connect=10)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+class _HrefCollector:
+    """lxml parser target that keeps the href of each <a> start tag."""
+
+    def __init__(self):
+        self.hrefs: List[str] = []
+
+    def start(self, tag, attrib):
+        if tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.hrefs.append(href)
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self) -> List[str]:
+        return self.hrefs
+
+def html_links(url: str, html: str) -> List[str]:
+    """
+    Extract a page's same-domain links from its HTML.
+    
+    Results are cached (see _LinkCache), so the returned list is shared
+    and must not be modified. Module-level so it can be sent to a worker
+    process.
+    """
+    key = _LinkCache.key(url, html)
+    links = _link_cache.get(key)
+    if links is None:
+        links = list(Crawler.iter_same_domain_links(url, html))
+        _link_cache.put(key, links)
+    return links
+
+def parse_with_links(parser, url: str, html: str, extra: Optional[dict]):
+    """
+    Parse a page and extract its same-domain links from a single HTML parse.
+    
+    Used when the HTML is the only source of links (Firecrawl reported
+    none). With the "lxml" link extractor the parser's tree (see
+    FirecrawlParser.load_tree) also serves the link extraction, instead of
+    a second parse; the other extractors (and parsers without load_tree)
+    parse the HTML themselves. Links come from the link cache when the page
+    was seen before (see _LinkCache).
+    
+    Module-level so it can be sent to a worker process.
+    
+    Returns:
+        (PageAssets, links) where links are as from html_links()
+    """
+    key = _LinkCache.key(url, html)
+    links = _link_cache.get(key)
+    if links is not None:
+        # Same page under another query string: only the content is needed
+        return parser.parse(url, html, extra), links
+    load_tree = getattr(parser, "load_tree", None)
+    tree = load_tree(html) if load_tree is not None else None
+    if tree is not None and CRAWLER_CONFIG["link_extractor"] == "lxml":
+        # The <a> tags straight from the parser's tree; no second parse
+        links = list(Crawler.iter_links_from_hrefs(url, tree.xpath("//a/@href")))
+    else:
+        links = list(Crawler.iter_same_domain_links(url, html))
+    _link_cache.put(key, links)
+    if tree is None:
+        return parser.parse(url, html, extra), links
+    return parser.parse(url, html, extra, tree=tree), links
+
+def run(coro):
+    """
+    Run a coroutine like asyncio.run(), on uvloop when it is installed.
+    
+    uvloop's libuv-based event loop has much lower per-callback overhead
+    than the default loop, which matters with many concurrent fetches.
+    It is optional (not available on Windows); without it this is just
+    asyncio.run().
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
 def get_class_from_name(class_name: str):
     """Dynamically import a class from its full name"""
     module_name, class_name = class_name.rsplit('.', 1)
@@ -59,9 +295,12 @@ class Crawler:
         fetcher: Component that handles HTTP requests
         parser: Component that parses HTML content
         store: Component that stores crawled data
-        frontier: Set of URLs waiting to be processed
-        depth_map: Dictionary mapping URLs to their crawl depth
-        processed: Set of URLs that have been processed
+        frontier: FIFO queue of (url, depth) pairs waiting to be fetched
+        seen: Fingerprints (see url_fingerprint) of every URL ever queued
+        processed_count: Number of URLs processed (fetched, or failed to fetch)
+        
+        On crawls whose max_pages reaches CRAWLER_CONFIG["bloom_min_pages"],
+        seen is a BloomFilter instead of a set.
     """
     
     def __init__(self):
@@ -74,11 +313,38 @@ class Crawler:
         self.fetcher_cls = get_class_from_name(FETCHER_CLS_NAME)  # Store fetcher class for dynamic instantiation
         self.parser = get_class_from_name(PARSER_CLS_NAME)()  # Parses HTML content
         self.store = get_class_from_name(STORAGE_CLS_NAME)(REST_API_CONFIG)  # Stores crawled data via REST API
-        self.frontier: Set[str] = set()  # Set of URLs waiting to be processed
-        self.depth_map: Dict[str, int] = {}  # Maps URLs to their depth in the crawl
-        self.processed: Set[str] = set()  # Set of URLs that have been processed
+        self.frontier: Optional[asyncio.Queue] = None  # (url, depth) pairs waiting to be fetched
+        self.seen: Set[int] = set()  # Fingerprints of URLs that have ever been queued
+        self.processed_count: int = 0  # URLs processed so far
+        self._max_depth: int = CRAWLER_CONFIG["max_depth"]  # Read once per crawl, used per page
+        self._max_pages: int = CRAWLER_CONFIG["max_pages"]
+        self._admitted: int = 0  # URLs queued so far; counts against max_pages
+        self._write_q: Optional[asyncio.Queue] = None  # Pages waiting for the storage writer
+        self._host_next_fetch: Dict[str, float] = {}  # Earliest loop time for each host's next fetch
+        self._report_lines: List[str] = []  # Per-page status lines not yet written
+        self._parse_pool: Optional[ProcessPoolExecutor] = None  # Set for crawls with parse_processes > 0
+        self._session: Optional[aiohttp.ClientSession] = None  # Shared by crawls inside "async with"
+
+    async def __aenter__(self) -> "Crawler":
+        """
+        Open a session shared by every crawl() made inside the block.
+        
+        Example:
+            >>> async with Crawler() as crawler:
+            ...     await crawler.crawl("https://example.com")
+            ...     await crawler.crawl("https://example.org")  # Reuses connections
+        """
+        self._session = create_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Close the shared session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     @staticmethod
+    @lru_cache(maxsize=200_000)
     def canonical(url: str) -> str:
         """
         Canonicalize a URL by standardizing its format.
@@ -96,6 +362,9 @@ class Crawler:
         Returns:
             The canonicalized URL
             
+        Results are memoized (bounded LRU): heavily cross-linked sites repeat
+        the same URLs on many pages.
+        
         Example:
             >>> Crawler.canonical("https://Example.com/page/#section?param=value")
             'https://example.com/page?param=value'
@@ -104,20 +373,53 @@ class Crawler:
             >>> Crawler.canonical("https://www.aezion.com/blogs/page/6/?et_blog")
             'https://aezion.com/blogs/page/6?et_blog'
         """
-        from urllib.parse import parse_qs, urlencode
-        
-        # Parse the URL
-        u = urlparse(url)
+        # Already canonical (no query, fragment or trailing slash; lowercase
+        # host without www.): the common case for sites that link consistently.
+        # isprintable() rules out the tabs/newlines urlsplit would remove
+        if (url.startswith(('https://', 'http://')) and '?' not in url and '#' not in url
+                and url[-1] not in '/;' and url.isprintable()):
+            start = url.index('//') + 2
+            end = url.find('/', start)
+            netloc = url[start:end] if end >= 0 else url[start:]
+            # Hosts with brackets (IPv6) or non-ASCII characters are left to
+            # urlsplit, which validates them
+            if (netloc and netloc.isascii() and netloc == netloc.lower()
+                    and not netloc.startswith('www.') and '[' not in netloc and ']' not in netloc):
+                return url
+        # Plain http(s) URLs: take the parts straight from one regex match
+        m = _HTTP_URL_RE.fullmatch(url)
+        if m is not None:
+            return Crawler._canonical_from_parts(*m.groups())
+        # Anything unusual (whitespace, IPv6, non-ASCII host, other schemes) goes
+        # through urlsplit; split_url shares its cache with the domain checks
+        return Crawler._canonical_from_split(split_url(url))
+
+    @staticmethod
+    def _canonical_from_split(u: SplitResult) -> str:
+        """
+        Canonicalize an already-split URL (see canonical()).
         
+        Lets callers that have split a URL anyway reuse the result
+        instead of parsing the same string twice.
+        """
+        return Crawler._canonical_from_parts(u.scheme, u.netloc, u.path, u.query)
+
+    @staticmethod
+    def _canonical_from_parts(scheme: str, netloc: str, path: str, query: Optional[str]) -> str:
+        """Build the canonical URL from its scheme, netloc, path and query."""
         # Normalize domain (remove www prefix and convert to lowercase)
-        netloc = u.netloc.lower()
-        if netloc.startswith('www.'):
-            netloc = netloc[4:]  # Remove www prefix
+        netloc = strip_www(netloc)
+        
+        # Drop an empty ";params" from the last path segment, as urlparse()
+        # and urlunparse() did ("/a/b;" -> "/a/b"); non-empty params are kept
+        if path.endswith(';') and scheme in uses_params:
+            if path.find(';', max(path.rfind('/'), 0)) == len(path) - 1:
+                path = path[:-1]
         
         # Normalize query parameters
-        if u.query:
+        if query:
             # Parse query parameters
-            query_params = parse_qs(u.query)
+            query_params = parse_qs(query)
             # Sort parameters for consistency
             sorted_params = dict(sorted(query_params.items()))
             # Rebuild query string
@@ -125,12 +427,14 @@ class Crawler:
         else:
             query = ""
         
-        # Build canonicalized URL
-        canonical_url = u._replace(
-            netloc=netloc,
-            query=query,
-            fragment=""  # Remove the fragment (part after #)
-        ).geturl()
+        # Build canonicalized URL (the fragment is dropped)
+        if netloc and scheme in ('http', 'https'):
+            # Common case: assemble directly instead of going through urlunsplit
+            canonical_url = f"{scheme}://{netloc}{path}"
+            if query:
+                canonical_url = f"{canonical_url}?{query}"
+        else:
+            canonical_url = urlunsplit((scheme, netloc, path, query, ""))
         
         # Remove trailing slash (except for root URLs)
         if canonical_url != '/' and canonical_url != 'https://' and canonical_url != 'http://':
@@ -156,14 +460,8 @@ class Crawler:
             >>> Crawler.is_same_domain("https://aezion.com/page", "https://other.com/page")
             False
         """
-        def strip_www(netloc: str) -> str:
-            """Remove www. prefix from domain if present."""
-            return netloc.lower().lstrip('www.')
-        
         try:
-            domain1 = strip_www(urlparse(url1).netloc)
-            domain2 = strip_www(urlparse(url2).netloc)
-            return domain1 == domain2
+            return url_host(url1) == url_host(url2)
         except Exception:
             return False
 
@@ -186,7 +484,7 @@ class Crawler:
             >>> Crawler.is_crawlable_url("tel:+1234567890")
             False
         """
-        return url.startswith("http://") or url.startswith("https://")
+        return url.startswith(("http://", "https://"))
 
     @staticmethod
     def same_domain_links(base: str, html: str) -> List[str]:
@@ -194,8 +492,10 @@ class Crawler:
         Extract and canonicalize links from HTML that are on the same domain.
         
         This method:
-        1. Parses the HTML using BeautifulSoup
-        2. Finds all <a> tags with href attributes
+        1. Finds all <a> tags with href attributes, using the extractor named
+           by CRAWLER_CONFIG["link_extractor"]: "selectolax" (Lexbor parser),
+           "lxml", or "regex" (compiled regex scan, no parser)
+        2. Skips fragments and special links (javascript:, mailto:, ...)
         3. Converts relative URLs to absolute URLs
         4. Filters out external links and special URLs
         5. Canonicalizes the remaining URLs
@@ -205,7 +505,7 @@ class Crawler:
             html: The HTML content of the page
             
         Returns:
-            A list of canonicalized URLs on the same domain
+            A list of unique canonicalized URLs on the same domain
             
         Example:
             >>> html = '''
@@ -217,46 +517,206 @@ class Crawler:
             >>> Crawler.same_domain_links("https://example.com", html)
             ['https://example.com/about', 'https://example.com/contact']
         """
-        # Parse the HTML content
-        soup = BeautifulSoup(html, "lxml")
-        # Get the domain of the base URL
-        base_domain = urlparse(base).netloc
-        links = set()  # Use set to avoid duplicates
+        # dict.fromkeys drops duplicates while keeping document order
+        return list(dict.fromkeys(Crawler.iter_same_domain_links(base, html)))
+
+    @staticmethod
+    def iter_same_domain_links(base: str, html: str) -> Iterator[str]:
+        """
+        Yield canonicalized same-domain links from HTML (see same_domain_links).
         
-        # Find all links (<a> tags with href attribute)
-        all_links = soup.find_all("a", href=True)
+        Links are yielded as they are found. Repeated hrefs are skipped, but
+        different hrefs can still yield the same link; callers that
+        deduplicate anyway (the crawler's seen set) skip building a set.
+        """
+        # Collect href values with the configured extractor
+        extractor = CRAWLER_CONFIG["link_extractor"]
+        if extractor == "selectolax":
+            hrefs = Crawler._selectolax_hrefs(html)
+        elif extractor == "regex":
+            hrefs = Crawler._regex_hrefs(html)
+        else:
+            hrefs = Crawler._lxml_hrefs(html)
+        return Crawler.iter_links_from_hrefs(base, hrefs)
+
+    @staticmethod
+    def iter_links_from_hrefs(base: str, hrefs: Iterable[str]) -> Iterator[str]:
+        """
+        Yield canonicalized same-domain links from raw href values.
+        
+        The filtering half of iter_same_domain_links, for callers that
+        already have the hrefs (e.g. from a parsed tree).
+        """
+        # Split the base URL once and derive everything the loop needs from it
+        base_parts = split_url(base)
+        base_prefix = f"{base_parts.scheme}://{base_parts.netloc}"
+        # Base domain in the same form canonical() produces
+        base_domain = strip_www(base_parts.netloc)
+        # URL prefixes that can only belong to the base domain (http/https,
+        # with and without www.), so most same-domain links skip the netloc check
+        same_domain_prefixes = tuple(
+            f"{scheme}://{host}{sep}"
+            for scheme in ('http', 'https')
+            for host in (base_domain, 'www.' + base_domain)
+            for sep in ('/', '?')
+        )
+        found = 0  # Links yielded
+        failed = 0  # hrefs that could not be resolved
+        seen_hrefs: Set[str] = set()  # Raw hrefs already handled on this page
         
-        for a in all_links:
-            # Remove the fragment from the href
-            href = urldefrag(a["href"])[0]
+        # Walk all links (<a> tags with href attribute)
+        for href in hrefs:
+            # Remove the fragment from the href (plain string split, no URL parsing)
+            href = href.partition('#')[0]
+            # Navigation and footers repeat the same hrefs; resolve each one once
+            if href in seen_hrefs:
+                continue
+            seen_hrefs.add(href)
             # Skip empty links or special links like javascript:, mailto:, etc.
-            if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            if not href or href.startswith(_SKIP_PREFIXES):
                 continue
                 
             try:
-                # Convert relative URLs to absolute URLs
-                abs_url = urljoin(base, href)
-                # Standardize the URL format
-                canonical_url = Crawler.canonical(abs_url)
+                # Convert relative URLs to absolute URLs; absolute and plain
+                # root-relative hrefs are built directly, the rest go through urljoin
+                if href.startswith(('http://', 'https://')):
+                    abs_url = href
+                elif href[0] == '/' and href[:2] != '//' and '/.' not in href:
+                    # Root-relative: on the base domain by construction
+                    found += 1
+                    yield Crawler.canonical(base_prefix + href)
+                    continue
+                else:
+                    abs_url = urljoin(base, href)
+                if abs_url.startswith(same_domain_prefixes):
+                    found += 1
+                    yield Crawler.canonical(abs_url)
+                    continue
+                u = split_url(abs_url)
                 
-                # Only keep links that are on the same domain
-                if urlparse(canonical_url).netloc == base_domain:
-                    links.add(canonical_url)
+                # Otherwise compare domains (checked before canonicalizing so
+                # external links skip the canonical() work)
+                if strip_www(u.netloc) == base_domain:
+                    # Standardize the URL format, reusing the split result
+                    found += 1
+                    yield Crawler._canonical_from_split(u)
             except Exception as e:
-                # Log any errors that occur during URL processing
+                # Count errors here; they are reported once per page below
+                failed += 1
                 continue
         
-        return list(links)
+        # One summary line per page rather than logging inside the loop
+        if failed and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s: %d same-domain links, %d hrefs failed to parse", base, found, failed)
+
+    @staticmethod
+    def _selectolax_hrefs(html: str) -> List[str]:
+        """
+        Return the href of every <a> tag, parsing the HTML with selectolax.
+        
+        Lexbor parses and runs the CSS selector in C, so this is the fastest
+        parser-based extractor.
+        """
+        from selectolax.lexbor import LexborHTMLParser
+        
+        if not html:
+            return []
+        nodes = LexborHTMLParser(html).css("a[href]")
+        # A bare <a href> has a None value; it would be skipped as empty anyway
+        return [href for href in (node.attributes.get("href") for node in nodes) if href is not None]
+
+    @staticmethod
+    def _lxml_hrefs(html: str) -> List[str]:
+        """
+        Return the href of every <a> tag, parsing the HTML with lxml.
+        
+        The parser feeds start tags to an _HrefCollector target instead of
+        building a tree, so memory stays at the href list no matter how big
+        the page is. Each call gets its own parser, so this is thread-safe.
+        """
+        if not html:
+            return []
+        parser = etree.HTMLParser(
+            target=_HrefCollector(),
+            encoding="utf-8",  # We re-encode the text, so ignore any declared charset
+            collect_ids=False,
+            remove_comments=True,
+            remove_pis=True,
+        )
+        try:
+            # With a target, fromstring() returns the target's close() value
+            return etree.fromstring(html.encode("utf-8"), parser)
+        except etree.LxmlError:
+            return []
+
+    @staticmethod
+    def _regex_hrefs(html: str) -> List[str]:
+        """
+        Return the href of every <a> tag using a regex scan (no DOM is built).
+        
+        Faster than _lxml_hrefs but less forgiving of unusual markup, e.g.
+        it also matches tags inside comments or scripts.
+        """
+        hrefs = []
+        for match in _HREF_RE.finditer(html):
+            href = match.group(1) or match.group(2) or match.group(3) or ""
+            if "&" in href:
+                href = html_lib.unescape(href)  # lxml decodes entities; match it
+            hrefs.append(href.strip())
+        return hrefs
+
+    def page_links(self, url: str, fetch_result) -> List[str]:
+        """
+        Return the canonical same-domain links of a fetched page.
+        
+        Uses the links Firecrawl reported when it reported any, otherwise
+        extracts them from the HTML with CRAWLER_CONFIG["link_extractor"].
+        Safe to call from a worker thread.
+        
+        Args:
+            url: The URL of the page
+            fetch_result: The FetchResult containing HTML and extra data
+            
+        Returns:
+            Canonicalized, crawlable links on the same domain as url
+        """
+        # Use links from Firecrawl if it reported any, otherwise extract from HTML
+        if fetch_result.extra and fetch_result.extra.get("links"):
+            firecrawl_links = fetch_result.extra["links"]
+            # canonical() lowercases the host and drops www., so a canonical link
+            # is on this page's domain exactly when it starts with one of these
+            # (or is the bare root); no URL parsing per link
+            base_domain = url_host(url)
+            roots = (f"http://{base_domain}", f"https://{base_domain}")
+            same_domain_prefixes = tuple(root + sep for root in roots for sep in ('/', '?'))
+            # Filter Firecrawl links to same domain and ensure they're crawlable
+            new_links = []
+            for link in firecrawl_links:
+                try:
+                    # Skip non-crawlable URLs (javascript:, tel:, mailto:, etc.)
+                    if not self.is_crawlable_url(link):
+                        continue
+                    
+                    canonical_link = self.canonical(link)
+                    if canonical_link.startswith(same_domain_prefixes) or canonical_link in roots:
+                        new_links.append(canonical_link)
+                except Exception as e:
+                    continue
+            return new_links
+        # Fallback to extracting links from HTML; duplicates are dropped by
+        # the seen check when queueing, so skip same_domain_links' dedup
+        return html_links(url, fetch_result.content)
 
     async def process_page(self, url: str, fetch_result, depth: int) -> None:
         """
         Process a single page: store its content and collect its links.
         
         This method:
-        1. Parses the page content using the parser component
-        2. Stores the page data and checks for changes
-        3. Extracts links if we haven't reached max depth
-        4. Adds new links to the frontier
+        1. Parses the page content and, if we haven't reached max depth,
+           extracts its links, off the event loop (from one HTML parse when
+           the links come from the HTML)
+        2. Queues the page data for the background storage writer
+        3. Queues unseen links for the next depth
         
         Args:
             url: The URL of the page being processed
@@ -265,51 +725,109 @@ class Crawler:
         """
         # Skip if we couldn't fetch the page
         if fetch_result is None or fetch_result.error:
-            print(f"❌ FAIL {url}")
+            self._report(f"❌ FAIL {url}")
             return
 
-        # Use the parser to extract assets (text, images, etc.) from the page
-        # Pass the extra data (markdown, links) to the parser
-        assets = self.parser.parse(url, fetch_result.content, fetch_result.extra)
-        # Store the page data and check if content or SEO elements changed
-        content_changed, seo_changed = self.store.upsert_page(assets)
-
-        # Show simple pass/fail status
-        if content_changed or seo_changed:
-            print(f"✅ PASS {url}")
-        elif content_changed is False and seo_changed is False:
-            print(f"❌ FAIL {url} (storage failed)")
+        # Parsing and link extraction are CPU-bound, so run them off the event
+        # loop: in worker processes if configured, otherwise in worker threads
+        # (lxml releases the GIL while parsing).
+        # The parser gets the extra data (markdown, links) from Firecrawl.
+        pool = self._parse_pool
+        loop = asyncio.get_running_loop()
+        content, extra = fetch_result.content, fetch_result.extra
+        want_links = depth + 1 <= self._max_depth  # No new links at max depth
+        
+        if want_links and not (extra and extra.get("links")):
+            # Firecrawl reported no links, so they have to come from the HTML
+            # (see parse_with_links)
+            if pool is not None:
+                job = loop.run_in_executor(pool, parse_with_links, self.parser, url, content, extra)
+            else:
+                job = asyncio.to_thread(parse_with_links, self.parser, url, content, extra)
+            assets, new_links = await job
         else:
-            print(f"✅ PASS {url} (no changes)")
-
-        # Only look for new links if we haven't reached max depth
-        if depth + 1 <= CRAWLER_CONFIG["max_depth"]:
-            # Use links from Firecrawl if available, otherwise extract from HTML
-            if fetch_result.extra and "links" in fetch_result.extra:
-                firecrawl_links = fetch_result.extra["links"]
-                # Filter Firecrawl links to same domain and ensure they're crawlable
-                new_links = []
-                for link in firecrawl_links:
-                    try:
-                        # Skip non-crawlable URLs (javascript:, tel:, mailto:, etc.)
-                        if not self.is_crawlable_url(link):
-                            continue
-                        
-                        canonical_link = self.canonical(link)
-                        if self.is_same_domain(canonical_link, url):
-                            new_links.append(canonical_link)
-                    except Exception as e:
-                        continue
+            if pool is not None:
+                parse = loop.run_in_executor(pool, self.parser.parse, url, content, extra)
             else:
-                # Fallback to extracting links from HTML
-                new_links = self.same_domain_links(url, fetch_result.content)
-            
-            # Add new links to frontier
+                parse = asyncio.to_thread(self.parser.parse, url, content, extra)
+            if want_links:
+                # Firecrawl's link list is cheap to filter; do it alongside the parse
+                links = asyncio.to_thread(self.page_links, url, fetch_result)
+                assets, new_links = await asyncio.gather(parse, links)
+            else:
+                assets, new_links = await parse, None
+        
+        # Hand the page to the storage writer
+        await self._write_q.put(assets)
+
+        if new_links is not None:
+            # Queue new links one level deeper; FIFO order keeps the crawl
+            # breadth-first
+            frontier = self.frontier
+            child_depth = depth + 1
             for link in new_links:
-                # Only add to frontier if we haven't processed it yet and haven't seen it before
-                if link not in self.processed and link not in self.frontier:
-                    self.frontier.add(link)
-                    self.depth_map[link] = depth + 1
+                if self._admitted >= self._max_pages:
+                    break  # Page budget is spoken for; nothing more will be fetched
+                # Every queued URL is in seen, so this covers processed and pending URLs
+                key = url_fingerprint(link)
+                if key not in self.seen:
+                    self.seen.add(key)
+                    self._admitted += 1
+                    frontier.put_nowait((link, child_depth))
+
+    def _report(self, line: str) -> None:
+        """
+        Buffer a per-page status line; lines are written out in batches.
+        """
+        self._report_lines.append(line)
+        if len(self._report_lines) >= _REPORT_BATCH:
+            self._flush_report()
+
+    def _flush_report(self) -> None:
+        """Write buffered status lines to stdout in a single write."""
+        if self._report_lines:
+            lines, self._report_lines = self._report_lines, []
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    async def _writer_loop(self) -> None:
+        """
+        Store queued pages off the event loop, in groups.
+        
+        Storage calls are blocking HTTP requests, so they run in a worker
+        thread; a single writer keeps the store's batch buffer single-threaded.
+        Every page already waiting in the queue is taken along with the next
+        one, so a backlog is stored with one thread hop per group instead of
+        per page. Errors are reported per page and never stop the writer.
+        """
+        batch_upsert = getattr(self.store, 'upsert_pages_batch', None)
+        while True:
+            group = [await self._write_q.get()]
+            while len(group) < _WRITE_BATCH and not self._write_q.empty():
+                group.append(self._write_q.get_nowait())
+            try:
+                # Store the page data and check if content or SEO elements changed
+                if batch_upsert is not None:
+                    results = await asyncio.to_thread(batch_upsert, group)
+                else:
+                    results = await asyncio.to_thread(lambda: [self.store.upsert_page(a) for a in group])
+                for assets, (content_changed, seo_changed) in zip(group, results):
+                    # Show simple pass/fail status
+                    if content_changed or seo_changed:
+                        self._report(f"✅ PASS {assets.url}")
+                    elif content_changed is False and seo_changed is False:
+                        self._report(f"❌ FAIL {assets.url} (storage failed)")
+                    else:
+                        self._report(f"✅ PASS {assets.url} (no changes)")
+            except Exception as e:
+                # Keep draining the queue: if the writer died, _crawl_loop
+                # would wait on it forever
+                logger.error("Storage writer failed on %d pages: %s", len(group), e)
+                for assets in group:
+                    self._report(f"❌ FAIL {assets.url} (storage failed: {e})")
+            finally:
+                for _ in group:
+                    self._write_q.task_done()
 
     async def _crawl_loop(self, fetcher, start_url: str) -> None:
         """
@@ -317,71 +835,143 @@ class Crawler:
         """
         # Standardize the starting URL
         start_url = self.canonical(start_url)
+        # Read crawl settings once instead of on every loop iteration
+        max_depth = self._max_depth = CRAWLER_CONFIG["max_depth"]
+        max_pages = self._max_pages = CRAWLER_CONFIG["max_pages"]
+        crawl_delay = CRAWLER_CONFIG["crawl_delay"]
+        
         # Initialize data structures
-        self.frontier = {start_url}  # URLs to process
-        self.depth_map = {start_url: 0}  # Track depth of each URL
-        self.processed = set()  # URLs we've already processed
-        current_depth = 0  # Start at depth 0
+        self.frontier = asyncio.Queue()
+        self.frontier.put_nowait((start_url, 0))
+        self._admitted = 1
+        # URLs we've already queued; very large crawls trade exactness for memory.
+        # Only admitted URLs are added, so seen never exceeds max_pages entries
+        self.seen = BloomFilter(max_pages) if max_pages >= CRAWLER_CONFIG["bloom_min_pages"] else set()
+        self.processed_count = 0
+        self.seen.add(url_fingerprint(start_url))
+        self._host_next_fetch = {}
+        self._report_lines = []
+        concurrency = CRAWLER_CONFIG["concurrency"]  # Fetch workers
 
         print(f"🚀 Starting crawl: {start_url}")
-        print(f"📊 Max depth: {CRAWLER_CONFIG['max_depth']}, Max pages: {CRAWLER_CONFIG['max_pages']}\n")
+        print(f"📊 Max depth: {max_depth}, Max pages: {max_pages}\n")
 
-        # Continue crawling until we run out of URLs, reach max depth, or process max pages
-        while (self.frontier and 
-               current_depth <= CRAWLER_CONFIG["max_depth"] and 
-               len(self.processed) < CRAWLER_CONFIG["max_pages"]):
-            
-            # Get all URLs at the current depth level (BFS approach)
-            batch = {url for url in self.frontier if self.depth_map[url] == current_depth}
-            if not batch:
-                # If no URLs at current depth, move to next depth
-                current_depth += 1
-                continue
+        # Pages waiting to be stored; bounded so a slow store applies backpressure
+        self._write_q = asyncio.Queue(maxsize=1024)
+        writer = asyncio.create_task(self._writer_loop())
+        # Optional process pool so parsing uses more than one core; "spawn"
+        # avoids forking a process that has running threads
+        parse_processes = CRAWLER_CONFIG["parse_processes"]
+        self._parse_pool = ProcessPoolExecutor(
+            max_workers=parse_processes, mp_context=multiprocessing.get_context("spawn")
+        ) if parse_processes > 0 else None
+        try:
+            await self._run_workers(fetcher, concurrency, crawl_delay)
+            # Wait for every queued page to be stored
+            await self._write_q.join()
+        finally:
+            writer.cancel()
+            if self._parse_pool is not None:
+                # Waiting for the worker processes to exit blocks, so do it
+                # off the event loop
+                pool, self._parse_pool = self._parse_pool, None
+                await asyncio.to_thread(pool.shutdown, cancel_futures=True)
+            # The URL caches pay off within a crawl; release them so a
+            # long-running server doesn't hold on to the last site's URLs
+            clear_url_caches()
 
-            # Remove batch URLs from the frontier
-            self.frontier -= batch
+        self._flush_report()
+        print(f"\n✅ Crawl complete: {self.processed_count} pages processed")
+        
+        # Flush any remaining pages in the batch buffer
+        if hasattr(self.store, 'flush_all'):
+            self.store.flush_all()
 
-            # Fetch all URLs in the batch concurrently
-            fetch_results = await asyncio.gather(*(fetcher.fetch(u) for u in batch))
+    async def _wait_for_host(self, url: str, crawl_delay: float) -> None:
+        """
+        Space out requests to the same host by crawl_delay seconds.
+        
+        Each host has its own "next allowed request" time, so politeness
+        toward one site never delays fetches from another. The slot is
+        reserved before sleeping so concurrent fetches queue up in order.
+        """
+        host = split_url(url).netloc
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._host_next_fetch.get(host, now))
+        self._host_next_fetch[host] = start + crawl_delay
+        if start > now:
+            await asyncio.sleep(start - now)
 
-            # Process each fetched page
-            for url, fetch_result in zip(batch, fetch_results):
+    async def _fetch_worker(self, fetcher, crawl_delay: float) -> None:
+        """
+        Fetch and process URLs from the frontier until cancelled.
+        
+        Several workers share the frontier, so at most that many fetches are
+        in flight and each page is processed as soon as its own fetch
+        finishes; links it adds can be picked up right away by idle workers.
+        """
+        frontier = self.frontier
+        while True:
+            url, depth = await frontier.get()
+            try:
+                # Politeness delay for this URL's host
+                await self._wait_for_host(url, crawl_delay)
+                fetch_result = await fetcher.fetch(url)
                 if fetch_result is not None and not fetch_result.error:
-                    await self.process_page(url, fetch_result, current_depth)
+                    await self.process_page(url, fetch_result, depth)
                 else:
                     # Mark as failed if fetch failed
-                    print(f"❌ FAIL {url} (fetch failed)")
-                self.processed.add(url)  # Mark as processed regardless of fetch result
-
-            # Wait before next batch (to be polite to servers)
-            await asyncio.sleep(CRAWLER_CONFIG["crawl_delay"])
+                    self._report(f"❌ FAIL {url} (fetch failed)")
+            except Exception as e:
+                # One bad page must not take a worker down with it
+                self._report(f"❌ FAIL {url} ({e})")
+            finally:
+                self.processed_count += 1  # Count as processed regardless of fetch result
+                frontier.task_done()
             
             # Print progress information
-            print(f"📈 Depth {current_depth}: {len(self.frontier)} pending, {len(self.processed)} processed")
-
-            # Check if we need to move to the next depth
-            if not any(self.depth_map[url] == current_depth for url in self.frontier):
-                current_depth += 1
+            processed = self.processed_count
+            if processed % _PROGRESS_EVERY == 0:
+                self._flush_report()
+                print(f"📈 Depth {depth}: {frontier.qsize()} pending, {processed} processed")
 
-        print(f"\n✅ Crawl complete: {len(self.processed)} pages processed")
+    async def _run_workers(self, fetcher, concurrency: int, crawl_delay: float) -> None:
+        """
+        Crawl the frontier with a fixed pool of workers until it is empty.
         
-        # Flush any remaining pages in the batch buffer
-        if hasattr(self.store, 'flush_all'):
-            self.store.flush_all()
+        Depth and page limits are applied when links are queued (see
+        process_page), so the frontier only ever holds pages to fetch. There
+        is no barrier between depth levels: a slow page only holds up its
+        own worker.
+        """
+        workers = [
+            asyncio.create_task(self._fetch_worker(fetcher, crawl_delay))
+            for _ in range(concurrency)
+        ]
+        try:
+            # Done once every queued URL is processed and none added more
+            await self.frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
 
-    async def crawl(self, start_url: str) -> None:
+    async def crawl(self, start_url: str, session: Optional[aiohttp.ClientSession] = None) -> None:
         """
         Crawl a website starting from the given URL using BFS.
         
         This method:
         1. Initializes the crawl with the start URL
-        2. Processes pages level by level (BFS)
-        3. Fetches multiple pages concurrently
-        4. Respects crawl delay between batches
+        2. Processes pages in breadth-first order from a FIFO frontier
+        3. Fetches multiple pages concurrently (up to CRAWLER_CONFIG["concurrency"])
+        4. Respects crawl delay between requests to the same host
         5. Stops when max depth or max pages is reached
         
         Args:
             start_url: The URL to start crawling from
+            session: Optional long-lived session (see create_session()) to
+                reuse across crawls; defaults to the crawler's own session
+                inside "async with", otherwise one is created and closed
             
         Example:
             >>> crawler = Crawler()
@@ -392,7 +982,13 @@ class Crawler:
             # Depth 2: example.com/about/team, example.com/contact/form
             # etc.
         """
-        async with aiohttp.ClientSession() as session:
+        if session is None:
+            session = self._session
+        if session is not None:
+            # Reuse the long-lived session (and its warm keep-alive connections)
+            await self._crawl_loop(self.fetcher_cls(session), start_url)
+            return
+        async with create_session() as session:
             fetcher = self.fetcher_cls(session)
             await self._crawl_loop(fetcher, start_url)
 
@@ -417,9 +1013,9 @@ async def main():
         sys.exit(1)
 
     # Create crawler and start crawling from the provided URL
-    crawler = Crawler()
-    await crawler.crawl(sys.argv[1])
+    async with Crawler() as crawler:
+        await crawler.crawl(sys.argv[1])
 
 # Run the main function when script is executed directly
 if __name__ == "__main__":
-    asyncio.run(main())  # Run the async main function 
\ No newline at end of file
+    run(main())  # Run the async main function (on uvloop if available)
\ No newline at end of file
@@ -23,10 +23,13 @@ Example:
         print(chunk)
     ```
 """
+import os
 import tiktoken
 from typing import List, Iterator
 from src.config.settings import MODEL_CONFIG
 
+ENCODING_NAME = "cl100k_base"  # Same as OpenAI tiktoken
+
 class TextChunker:
     """
     Splits text into chunks of specified token length.
@@ -35,6 +38,11 @@ class TextChunker:
     that are suitable for embedding models. It ensures that chunks are
     tokenized consistently with OpenAI's models.
     
+    Chunkers are cheap to create: tiktoken builds each encoding once per
+    process and hands every later get_encoding() call the same instance, so
+    all chunkers share one encoder. The encoder is thread-safe (its Rust
+    core releases the GIL), so one chunker can also serve several threads.
+    
     Attributes:
         max_tokens: Maximum number of tokens per chunk
         encoder: The tiktoken encoder for tokenization
@@ -53,7 +61,8 @@ class TextChunker:
             512
         """
         self.max_tokens = max_tokens
-        self.encoder = tiktoken.get_encoding("cl100k_base")  # same as OpenAI tiktoken
+        # Shared per-process instance; only the first call loads the BPE ranks
+        self.encoder = tiktoken.get_encoding(ENCODING_NAME)
 
     def chunk_text(self, text: str) -> List[str]:
         """
@@ -78,8 +87,27 @@ class TextChunker:
         """
         if not text:
             return []
+        return self.chunk_ids(self.encoder.encode_ordinary(text))
+
+    def chunk_ids(self, ids: List[int]) -> List[str]:
+        """
+        Split already-encoded text into chunks of max_tokens length.
+        
+        Lets callers that need the token ids for something else (e.g. to
+        truncate the page text) encode each document only once.
+        
+        Args:
+            ids: Token ids from self.encoder.encode()
+            
+        Returns:
+            List of non-empty text chunks, each at most max_tokens tokens
             
-        ids = self.encoder.encode(text)
+        Example:
+            >>> chunker = TextChunker(max_tokens=5)
+            >>> ids = chunker.encoder.encode("This is a longer text that will be split")
+            >>> chunker.chunk_ids(ids)
+            ['This is a longer', 'text that will', 'be split']
+        """
         chunks = []
         for i in range(0, len(ids), self.max_tokens):
             chunk = self.encoder.decode(ids[i : i + self.max_tokens]).strip()
@@ -87,6 +115,44 @@ class TextChunker:
                 chunks.append(chunk)
         return chunks
 
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """
+        Encode several texts at once.
+        
+        tiktoken tokenizes the texts on a thread pool in Rust (releasing the
+        GIL), so this is much faster than encoding them one by one. Single
+        texts (and single-core machines) are encoded directly, without a pool.
+        Special-token strings like "<|endoftext|>" are encoded as plain text.
+        
+        Args:
+            texts: The texts to encode
+            
+        Returns:
+            Token ids for each text, in order
+        """
+        threads = min(len(texts), os.cpu_count() or 1)
+        if threads <= 1:
+            # One text or one core: skip starting a thread pool for nothing
+            return [self.encoder.encode_ordinary(text) for text in texts]
+        return self.encoder.encode_ordinary_batch(texts, num_threads=threads)
+
+    def chunk_texts_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Split several texts into chunks, tokenizing them in parallel.
+        
+        Args:
+            texts: The texts to split into chunks
+            
+        Returns:
+            The chunks of each text (see chunk_text), in order
+            
+        Example:
+            >>> chunker = TextChunker(max_tokens=5)
+            >>> chunker.chunk_texts_batch(["First text", "Second text"])
+            [['First text'], ['Second text']]
+        """
+        return [self.chunk_ids(ids) for ids in self.encode_batch(texts)]
+
     def chunk_texts(self, texts: List[str]) -> Iterator[str]:
         """
         Split multiple texts into chunks.
@@ -106,5 +172,5 @@ class TextChunker:
             >>> list(chunker.chunk_texts(texts))
             ['First text', 'Second text']
         """
-        for text in texts:
-            yield from self.chunk_text(text) 
\ No newline at end of file
+        for chunks in self.chunk_texts_batch(texts):
+            yield from chunks 
\ No newline at end of file
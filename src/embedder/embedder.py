@@ -27,13 +27,25 @@ Example:
         )
     ```
 """
+import hashlib
 import json
-from typing import List, Optional
-from sentence_transformers import SentenceTransformer
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 
+import numpy as np
+
 from src.config.settings import REST_API_CONFIG, MODEL_CONFIG, CRAWLER_CONFIG, SEARCH_CONFIG
 from src.embedder.chunker import TextChunker
+from src.embedder.model import load_embedding_model, vector_payloads
+
+# Text hash -> vector LRU shared by every Embedder in the process (see
+# Embedder._encode_cached); the API server creates one Embedder per job, so
+# a re-run over unchanged pages finds their vectors here
+_vector_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_vector_cache_lock = threading.Lock()
 
 class Embedder:
     """
@@ -60,7 +72,6 @@ class Embedder:
         and establishes a connection to the REST API.
         """
         import os
-        from sentence_transformers import SentenceTransformer
         from huggingface_hub import snapshot_download
         
         # Check if model is already cached
@@ -81,23 +92,43 @@ class Embedder:
                 print("[INFO] This may take several minutes on first run...")
             
             # Load the model (will use cache if available)
-            self.model = SentenceTransformer(model_name)
-            print(f"[INFO] Model loaded successfully: {model_name}")
+            self.model = load_embedding_model(model_name)
+            print(f"[INFO] Model loaded successfully: {model_name} ({MODEL_CONFIG['backend']} backend)")
             
         except Exception as e:
             print(f"[ERROR] Failed to load model {model_name}: {e}")
             raise
         
+        # With several devices, sentence-transformers runs one worker process
+        # per device, each with its own copy of the model (see encode_pages)
+        self.encode_pool = None
+        devices = MODEL_CONFIG["encode_devices"]
+        if devices:
+            if any(device.startswith("cpu") for device in devices):
+                # CPU workers receive the model through torch.multiprocessing;
+                # with the weights in shared memory they all map this one
+                # copy (~1.3 GB) instead of holding one each
+                self.model.share_memory()
+            self.encode_pool = self.model.start_multi_process_pool(target_devices=devices)
+            print(f"[INFO] Encoding on {len(devices)} devices: {', '.join(devices)}")
+        
         self.chunker = TextChunker()
         self.rest_config = REST_API_CONFIG
+        # One session for all REST calls, so requests reuse a kept-alive
+        # connection instead of opening a new one each time
+        import requests
+        self.session = requests.Session()
 
     def __enter__(self):
         """Context manager entry point."""
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit point - no cleanup needed for REST API."""
-        pass
+        """Context manager exit point - closes the REST API session and stops encode workers."""
+        self.session.close()
+        if self.encode_pool is not None:
+            self.model.stop_multi_process_pool(self.encode_pool)
+            self.encode_pool = None
 
     def get_targets(self) -> List[tuple]:
         """
@@ -117,13 +148,14 @@ class Embedder:
                 ('https://example.com/about', 'About page...', '2024-03-20 11:00:00', '2024-03-19 15:00:00')
             ]
         """
-        import requests
-        
         try:
             url = f"{self.rest_config['base_url']}/pages/for-embedding"
-            response = requests.get(url, timeout=self.rest_config['timeout'])
+            response = self.session.get(url, timeout=self.rest_config['timeout'])
             response.raise_for_status()
-            data = response.json()
+            # Parse the raw bytes: response.json() first decodes the whole
+            # body into a str, a second full copy of every page's text
+            data = json.loads(response.content)
+            del response
             
             # Handle the direct array response from the database API
             return [(page["url"], page["clean_text"], None, None) for page in data]
@@ -141,6 +173,8 @@ class Embedder:
         3. Generates embeddings for each chunk
         4. Stores all embeddings via REST API
         
+        See embed_pages() for embedding many pages at once.
+        
         Args:
             url: The URL of the page being embedded
             clean_text: The cleaned text content of the page
@@ -156,97 +190,234 @@ class Embedder:
             # 3. Generate embeddings for each chunk
             # 4. Store all embeddings via REST API
         """
-        if not clean_text:
-            return
+        self.embed_pages([(url, clean_text)])
 
-        # 1. Page-level embedding
-        page_vec = self.model.encode(
-            clean_text,
-            show_progress_bar=False,
-            normalize_embeddings=True
-        )
+    def embed_pages(self, pages: List[Tuple[str, str]]) -> None:
+        """
+        Embed several pages and their chunks with a single model.encode call.
+        
+        This method:
+        1. Splits each page into chunks
+        2. Encodes all page texts and chunks together in one flat list, so the
+           model runs full-size batches instead of one or two small ones per page
+           (with MODEL_CONFIG["fuse_page_vec"], only the chunks are encoded and
+           each page vector is the normalized mean of its chunk vectors)
+        3. Slices the vectors back out per page and stores them via REST API
+        
+        run() does the same, but stores each group of pages while the next
+        group is being encoded (see encode_pages and store_pages).
+        
+        Args:
+            pages: (url, clean_text) pairs to embed
+            
+        Example:
+            >>> embedder.embed_pages([
+            ...     ("https://example.com", "Home page content..."),
+            ...     ("https://example.com/about", "About page content..."),
+            ... ])
+        """
+        self.store_pages(self.encode_pages(pages))
 
-        # 2. Chunk-level embeddings
-        chunks = self.chunker.chunk_text(clean_text)
-        if not chunks:
-            return
+    def encode_pages(self, pages: List[Tuple[str, str]]) -> List[tuple]:
+        """
+        Chunk and encode pages without storing them (see embed_pages).
+        
+        Args:
+            pages: (url, clean_text) pairs to embed
+            
+        Returns:
+            (url, page_vec, chunks, chunk_vecs) per page, ready for store_pages
+        """
+        # Pages without text or chunks are skipped, as before
+        encoder = self.chunker.encoder
+        page_tokens = MODEL_CONFIG["page_text_tokens"]
+        pages = [(url, clean_text) for url, clean_text in pages if clean_text]
+        # Encode each page once, all pages in parallel; the ids give both the
+        # chunks and the truncated page text
+        all_ids = self.chunker.encode_batch([clean_text for _, clean_text in pages])
+        batch = []
+        for (url, clean_text), ids in zip(pages, all_ids):
+            chunks = self.chunker.chunk_ids(ids)
+            if chunks:
+                # The model only reads the start of the page text, but would
+                # tokenize all of it first; hand it just the leading tokens
+                page_text = clean_text if len(ids) <= page_tokens else encoder.decode(ids[:page_tokens])
+                batch.append((url, page_text, chunks))
+        if not batch:
+            return []
 
-        vecs = self.model.encode(
-            chunks,
-            show_progress_bar=False,
-            normalize_embeddings=True
-        )
+        # Page texts first, then every page's chunks; offsets mark where each
+        # page's chunks start
+        fuse = MODEL_CONFIG["fuse_page_vec"]
+        flat_texts = [] if fuse else [page_text for _, page_text, _ in batch]
+        offsets = []
+        for _, _, chunks in batch:
+            offsets.append(len(flat_texts))
+            flat_texts.extend(chunks)
+
+        vecs = self._encode_cached(flat_texts)
+        if fuse:
+            # Page vectors from the chunk vectors: normalized mean per page
+            page_vecs = np.stack([
+                vecs[start:start + len(chunks)].mean(axis=0)
+                for (_, _, chunks), start in zip(batch, offsets)
+            ])
+            page_vecs /= np.linalg.norm(page_vecs, axis=1, keepdims=True)
+            # Same layout as the unfused case: page vectors, then chunks
+            vecs = np.concatenate([page_vecs, vecs])
+            offsets = [start + len(batch) for start in offsets]
+        vec_lists = vector_payloads(vecs, self.rest_config.get("vector_encoding", "json"))
+        return [
+            (url, vec_lists[i], chunks, vec_lists[start:start + len(chunks)])
+            for i, ((url, _, chunks), start) in enumerate(zip(batch, offsets))
+        ]
+
+    def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, reusing vectors of texts encoded before.
         
-        # Prepare batch data for REST API
-        # Extract page_id from the URL by getting the page from the database
-        import requests
-        from urllib.parse import quote
+        Texts are looked up by a 16-byte blake2b digest in a process-wide
+        LRU of MODEL_CONFIG["vector_cache_size"] vectors; only texts missing
+        from it (each distinct text once) reach the model. Pages whose text
+        is unchanged since an earlier run in this process are still stored
+        (so the API marks them embedded) but cost no encoding.
+        
+        Args:
+            texts: The texts to encode
+            
+        Returns:
+            Normalized vectors, one row per text, in order
+        """
+        cache = _vector_cache
+        keys = [hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest() for text in texts]
+        cached = {}  # key -> vector found in the cache
+        new_index = {}  # key -> row in new_vecs
+        new_texts = []
+        with _vector_cache_lock:
+            for key, text in zip(keys, texts):
+                if key in cached or key in new_index:
+                    continue
+                vec = cache.get(key)
+                if vec is not None:
+                    cache.move_to_end(key)
+                    cached[key] = vec
+                else:
+                    new_index[key] = len(new_texts)
+                    new_texts.append(text)
+        # Encode outside the lock
+        new_vecs = self._encode(new_texts) if new_texts else None
         
-        # Use the original URL (not canonicalized) since the database stores URLs with www
-        # The crawler stores the original URLs from Firecrawl, not canonicalized ones
-        original_url = url
+        rows = [cached[key] if key in cached else new_vecs[new_index[key]] for key in keys]
         
+        max_size = MODEL_CONFIG["vector_cache_size"]
+        if max_size > 0 and new_index:
+            with _vector_cache_lock:
+                for key, i in new_index.items():
+                    # Copy: a row view would keep the whole new_vecs array alive
+                    cache[key] = new_vecs[i].copy()
+                while len(cache) > max_size:
+                    cache.popitem(last=False)
+        return np.stack(rows)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the model (normalized, as float32 numpy)."""
+        if self.encode_pool is not None:
+            # Split the texts across the per-device worker processes. Older
+            # sentence-transformers take no normalize_embeddings here, so
+            # normalize the result ourselves
+            vecs = self.model.encode_multi_process(
+                texts,
+                self.encode_pool,
+                batch_size=MODEL_CONFIG["encode_batch_size"],
+            )
+            vecs = np.asarray(vecs, dtype=np.float32)
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+        else:
+            vecs = self.model.encode(
+                texts,
+                batch_size=MODEL_CONFIG["encode_batch_size"],
+                show_progress_bar=False,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+        # A half-precision model (MODEL_CONFIG["dtype"]) returns fp16 vectors;
+        # stored vectors stay float32
+        return np.asarray(vecs, dtype=np.float32)
+
+    def store_pages(self, encoded: List[tuple]) -> None:
+        """
+        Store pages returned by encode_pages via REST API.
+        
+        With REST_API_CONFIG["vectors_batch"], all pages go in a single
+        vectors/embed/batch request ({"items": [...]}, each item shaped like
+        a vectors/embed body); otherwise each page gets its own request.
+        
+        Args:
+            encoded: (url, page_vec, chunks, chunk_vecs) per page
+        """
+        if not self.rest_config.get("vectors_batch"):
+            for url, page_vec, chunks, vecs in encoded:
+                self._store_embeddings(url, page_vec, chunks, vecs)
+            return
+        if not encoded:
+            return
+        
+        items = [self._embed_data(url, page_vec, chunks, vecs) for url, page_vec, chunks, vecs in encoded]
         try:
-            # URL encode the original URL for the API call
-            encoded_url = quote(original_url, safe='')
-            page_response = requests.get(f"{self.rest_config['base_url']}/pages/url/{encoded_url}", timeout=self.rest_config['timeout'])
-            if page_response.status_code == 200:
-                page_info = page_response.json()
-                if page_info:
-                    page_id = page_info["id"]
-                else:
-                    print(f"[WARNING] Could not find page_id for URL: {original_url}")
-                    return
-            else:
-                print(f"[WARNING] Could not fetch page info for URL: {original_url}")
-                return
+            batch_url = f"{self.rest_config['base_url']}/vectors/embed/batch"
+            response = self.session.post(batch_url, json={"items": items}, timeout=self.rest_config['timeout'])
+            response.raise_for_status()
         except Exception as e:
-            print(f"[ERROR] Exception getting page_id: {e}")
-            return
+            print(f"[ERROR] Exception storing {len(items)} page(s): {e}")
+            raise
 
-        # Prepare chunks data for our database API
-        chunks_data = [
-            {
-                "chunk_index": i,
-                "text": chunk,
-                "vec": vec.tolist()
-            }
-            for i, (chunk, vec) in enumerate(zip(chunks, vecs))
-        ]
+    def _store_embeddings(self, url: str, page_vec, chunks: List[str], vecs) -> None:
+        """
+        Store a page's summary vector and chunk vectors via REST API.
         
-        # Store chunks using the chunks batch endpoint
+        Makes one vectors/embed request on the shared session. The endpoint
+        is keyed by URL, so no page_id lookup is needed; pages the API
+        doesn't know (404) are skipped with a warning.
+        
+        Args:
+            url: The URL of the page, as stored by the crawler
+            page_vec: Page-level embedding, from vector_payloads()
+            chunks: The page's text chunks
+            vecs: One embedding per chunk, from vector_payloads()
+        """
+        # Update page with summary vector using the vectors embed endpoint;
+        # it stores the chunks too, so no separate chunks/batch call
+        embed_data = self._embed_data(url, page_vec, chunks, vecs)
+        
+        # Send to REST API
         try:
-            chunks_url = f"{self.rest_config['base_url']}/chunks/batch"
-            chunks_response = requests.post(chunks_url, 
-                params={"page_url": url},
-                json=chunks_data,
-                timeout=self.rest_config['timeout'])
-            chunks_response.raise_for_status()
+            embed_url = f"{self.rest_config['base_url']}/vectors/embed"
+            response = self.session.post(embed_url, json=embed_data, timeout=self.rest_config['timeout'])
+            if response.status_code == 404:
+                print(f"[WARNING] Page not found for URL: {url}")
+                return
+            response.raise_for_status()
         except Exception as e:
-            print(f"[ERROR] Exception storing chunks: {e}")
+            print(f"[ERROR] Exception in embed_page: {e}")
             raise
 
-        # Update page with summary vector using the vectors embed endpoint
-        embed_data = {
+    @staticmethod
+    def _embed_data(url: str, page_vec, chunks: List[str], vecs) -> dict:
+        """Build the vectors/embed request body for one page."""
+        # base64-encoded vectors (see vector_payloads) go in *_b64 fields
+        suffix = "_b64" if isinstance(page_vec, str) else ""
+        return {
             "url": url,
-            "page_vector": page_vec.tolist(),
+            "page_vector" + suffix: page_vec,
             "chunks": [
                 {
+                    "chunk_index": i,
                     "text": chunk,
-                    "vector": vec.tolist()
+                    "vector" + suffix: vec
                 }
-                for chunk, vec in zip(chunks, vecs)
+                for i, (chunk, vec) in enumerate(zip(chunks, vecs))
             ]
         }
-        
-        # Send to REST API
-        try:
-            embed_url = f"{self.rest_config['base_url']}/vectors/embed"
-            response = requests.post(embed_url, json=embed_data, timeout=self.rest_config['timeout'])
-            response.raise_for_status()
-        except Exception as e:
-            print(f"[ERROR] Exception in embed_page: {e}")
-            raise
 
     def run(self) -> None:
         """
@@ -254,8 +425,10 @@ class Embedder:
         
         This method:
         1. Gets all pages that need embedding
-        2. Processes each page with a progress bar
-        3. Generates and stores embeddings for each page
+        2. Processes the pages in groups of MODEL_CONFIG["pages_per_encode"]
+        3. Generates and stores embeddings for each page; a writer thread
+           stores each group while the next one is encoded, so REST round
+           trips overlap with the model (which releases the GIL)
         
         Example:
             >>> embedder.run()
@@ -269,8 +442,26 @@ class Embedder:
             return
 
         print(f"🔍  {len(targets)} page(s) to embed …")
-        for url, clean_text, content_ts, embedded_ts in targets:
-            self.embed_page(url, clean_text)
+        # Encode several pages per model call (see embed_pages)
+        step = MODEL_CONFIG["pages_per_encode"]
+        # Pop groups off the front to release texts as we go instead of
+        # holding all until the end (a deque pops in O(1); del list[:step]
+        # would shift the whole backlog each time)
+        targets = deque(targets)
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            stored = None  # The group being stored
+            while targets:
+                group = []
+                while targets and len(group) < step:
+                    url, clean_text, _, _ = targets.popleft()
+                    group.append((url, clean_text))
+                encoded = self.encode_pages(group)
+                del group
+                if stored is not None:
+                    stored.result()  # At most one group in flight; re-raises store errors
+                stored = writer.submit(self.store_pages, encoded)
+            if stored is not None:
+                stored.result()
         print("✅  Embedding pass complete.")
 
     def _canonicalize_url(self, url: str) -> str:
@@ -323,11 +514,13 @@ class Embedder:
     @staticmethod
     def is_crawlable_url(url: str) -> bool:
         # Only allow http(s) URLs
-        return url.startswith("http://") or url.startswith("https://")
+        return url.startswith(("http://", "https://"))
 
 def is_same_domain(url1, url2):
     def strip_www(netloc):
-        return netloc.lower().lstrip('www.')
+        # Slice off the prefix; lstrip('www.') strips a character set
+        netloc = netloc.lower()
+        return netloc[4:] if netloc.startswith('www.') else netloc
     return strip_www(urlparse(url1).netloc) == strip_www(urlparse(url2).netloc)
 
 def main():
@@ -26,38 +26,81 @@ Example:
 """
 from typing import List, Tuple, Optional
 import sys
-from sentence_transformers import SentenceTransformer
+
+import numpy as np
+import requests
 
 from src.config.settings import REST_API_CONFIG, MODEL_CONFIG, SEARCH_CONFIG
+from src.embedder.model import load_embedding_model, vector_payloads
+
+# One HTTP session for every SemanticSearch in the process. The API server
+# creates a SemanticSearch per query, so sharing the session (and its pool
+# of kept-alive connections) means only the first query pays for connecting
+# to the database API. Created at import so threads never race to create it.
+_session = requests.Session()
+# Room for concurrent searches from several threads
+_adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=8)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
 
 class SemanticSearch:
     def __init__(self):
-        self.model = SentenceTransformer(MODEL_CONFIG["name"])
+        # Same model and backend as the embedder, so query vectors match stored ones
+        self.model = load_embedding_model(MODEL_CONFIG["name"])
         self.rest_config = REST_API_CONFIG
+        # Keep the connection to the API open between queries and instances
+        self.session = _session
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        pass
+        pass  # The session is shared; its connections stay open for the next search
 
     def search(self, question: str, top_k: int = SEARCH_CONFIG["top_k"]) -> List[Tuple[str, str, float]]:
         """Search for semantically similar chunks via REST API."""
-        # Encode the question
-        q_vec = self.model.encode(
-            question,
-            normalize_embeddings=True
-        ).tolist()
+        return self.search_batch([question], top_k)[0]
+
+    def search_batch(self, questions: List[str], top_k: int = SEARCH_CONFIG["top_k"]) -> List[List[Tuple[str, str, float]]]:
+        """
+        Search for several questions, encoding them in one model call.
+        
+        encode() sorts the questions by length and batches them, which is
+        much faster than encoding them one at a time; each question then
+        gets its own vectors/search request.
+        
+        Returns:
+            One result list per question, in order (see search())
+        """
+        if not questions:
+            return []
+        # Encode the questions
+        q_vecs = self.model.encode(
+            questions,
+            batch_size=32,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        # Query vectors in the stored vectors' float32, whatever MODEL_CONFIG["dtype"]
+        q_vecs = np.asarray(q_vecs, dtype=np.float32)
+        # Same wire format as the stored vectors: rounded floats or base64
+        # raw floats (REST_API_CONFIG["vector_encoding"]); one conversion for
+        # all questions
+        q_vecs = vector_payloads(q_vecs, self.rest_config.get("vector_encoding", "json"))
+        return [self._search_vector(q_vec, top_k) for q_vec in q_vecs]
 
+    def _search_vector(self, q_vec, top_k: int) -> List[Tuple[str, str, float]]:
+        """Run one vectors/search request for an encoded question (see vector_payloads)."""
         # Execute search via REST API
-        import requests
         try:
             url = f"{self.rest_config['base_url']}/vectors/search"
             data = {
-                "vector": q_vec,
+                # base64-encoded vectors go in a *_b64 field
+                "vector_b64" if isinstance(q_vec, str) else "vector": q_vec,
                 "limit": top_k
             }
-            response = requests.post(url, json=data, timeout=self.rest_config['timeout'])
+            response = self.session.post(url, json=data, timeout=self.rest_config['timeout'])
             response.raise_for_status()
             result = response.json()
             